@@ -1,12 +1,108 @@
-from flask import Flask, request, jsonify
+import json
+import re
+import msgpack
+import orjson
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from coordinator import Coordinator
 from config import DEFAULT_N, DEFAULT_R, DEFAULT_W
 from utils import validate_quorum_params
 from metrics import get_metrics
 
 
+MSGPACK_MIMETYPE = "application/msgpack"
+
+# Integer range that survives orjson and the msgpack internal RPCs exactly
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 64 - 1
+
+# A run of 19+ digits may be an integer orjson would silently turn into a float
+_LONG_DIGITS = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+
+def _reject_constant(name: str):
+    """
+    json.loads hook: reject NaN/Infinity, which orjson refuses too.
+    """
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _check_int_range(obj):
+    """
+    Raise ValueError if obj contains an integer outside the 64-bit range.
+    """
+    if isinstance(obj, bool):
+        return
+    if isinstance(obj, int):
+        if not _INT_MIN <= obj <= _INT_MAX:
+            raise ValueError("integers outside the 64-bit range are not supported")
+    elif isinstance(obj, dict):
+        for item in obj.values():
+            _check_int_range(item)
+    elif isinstance(obj, list):
+        for item in obj:
+            _check_int_range(item)
+
+
+def msgpack_response(obj, status: int = 200) -> Response:
+    """
+    Build a MessagePack response (used by the internal node-to-node API).
+    """
+    return Response(msgpack.packb(obj), status=status, mimetype=MSGPACK_MIMETYPE)
+
+
+def read_internal_body():
+    """
+    Decode an internal request body, MessagePack or JSON depending on Content-Type.
+    """
+    if request.mimetype == MSGPACK_MIMETYPE:
+        return msgpack.unpackb(request.get_data(), raw=False)
+    return request.get_json(force=True)
+
+
+def internal_response(obj, status: int = 200):
+    """
+    Encode an internal response as MessagePack if the peer prefers it, JSON otherwise.
+    """
+    if request.accept_mimetypes.best == MSGPACK_MIMETYPE:
+        return msgpack_response(obj, status)
+    return jsonify(obj), status
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson, used by jsonify() and request.get_json().
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        """
+        Unlike the stdlib provider, NaN/Infinity and integers outside the 64-bit
+        range are rejected (ValueError, so a 400) instead of being stored:
+        orjson would otherwise silently parse big integers as floats.
+        """
+        pattern = _LONG_DIGITS_BYTES if isinstance(s, (bytes, bytearray)) else _LONG_DIGITS
+        if pattern.search(s) is None:
+            return orjson.loads(s)
+
+        # Possible big integer: parse exactly and reject what can't round-trip
+        obj = json.loads(s, parse_constant=_reject_constant)
+        _check_int_range(obj)
+        return obj
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype="application/json"
+        )
+
+
 def create_app(coordinator: Coordinator):
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     # ---------- CLIENT-FACING API ----------
 
@@ -56,17 +152,40 @@ def create_app(coordinator: Coordinator):
 
     # ---------- INTERNAL NODE-TO-NODE API ----------
 
+    # Internal endpoints speak MessagePack when the peer asks for it, JSON otherwise
+
+    @app.route("/internal/ping", methods=["GET"])
+    def internal_ping():
+        # Liveness probe used by peers' failure detectors
+        return internal_response({"status": "ok"})
+
     @app.route("/internal/kv/<key>", methods=["PUT"])
     def internal_put(key):
-        payload = request.get_json(force=True)
+        payload = read_internal_body()
         coordinator.storage.put(key, payload)
-        return jsonify({"status": "ok"}), 200
+        return internal_response({"status": "ok"})
 
     @app.route("/internal/kv/<key>", methods=["GET"])
     def internal_get(key):
         # Internal GET should return ALL versions including tombstones
         versions = coordinator.storage.get_all(key)
-        return jsonify({"versions": versions}), 200
+        return internal_response({"versions": versions})
+
+    @app.route("/internal/kv:mget", methods=["POST"])
+    def internal_mget():
+        # Batched internal GET: {"keys": [...]} -> {"results": {key: [versions]}}
+        keys = read_internal_body().get("keys", [])
+        results = {key: coordinator.storage.get_all(key) for key in keys}
+        return internal_response({"results": results})
+
+    @app.route("/internal/kv:mput", methods=["POST"])
+    def internal_mput():
+        # Batched internal PUT: {"items": {key: [versions]}}
+        items = read_internal_body().get("items", {})
+        for key, versions in items.items():
+            for versioned_value in versions:
+                coordinator.storage.put(key, versioned_value)
+        return internal_response({"status": "ok"})
 
     # ---------- METRICS API ----------
 
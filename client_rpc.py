@@ -1,72 +1,181 @@
+import time
+import msgpack
 import requests
-from typing import Any, Dict, List
-from config import DEFAULT_REQUEST_TIMEOUT
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Tuple
+from config import DEFAULT_REQUEST_TIMEOUT, RPC_POOL_CONNECTIONS, RPC_POOL_MAXSIZE
 from failure import FailureDetector, FailureType
 from metrics import get_metrics
+from timeout_bandit import TimeoutBandit
+from utils import format_latency_ms
 
 
 # Global failure detector instance
 _failure_detector = FailureDetector(timeout=DEFAULT_REQUEST_TIMEOUT)
 
+# Global adaptive timeout selector (learns a timeout per node)
+_timeout_bandit = TimeoutBandit()
 
-def send_put(node: str, key: str, payload: Dict[str, Any], timeout: float = DEFAULT_REQUEST_TIMEOUT) -> bool:
+# Shared HTTP session so replica RPCs reuse keep-alive connections
+# instead of opening a new socket per request. pool_block caps the
+# connections per peer rather than opening throwaway extras under load.
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(
+    pool_connections=RPC_POOL_CONNECTIONS,
+    pool_maxsize=RPC_POOL_MAXSIZE,
+    pool_block=True,
+    max_retries=0
+))
+
+# Internal RPCs are MessagePack-encoded (smaller and faster to parse than JSON)
+_MSGPACK_MIMETYPE = "application/msgpack"
+_HEADERS = {"Content-Type": _MSGPACK_MIMETYPE, "Accept": _MSGPACK_MIMETYPE}
+
+
+def _select_timeout(node: str, timeout: Optional[float]) -> Tuple[float, Optional[tuple]]:
     """
-    Send PUT request to another node.
-    Returns True if successful, False otherwise.
+    Use the caller's timeout if given, otherwise ask the timeout bandit.
+    Returns (timeout, choice) where choice is the bandit's (action, context) or None.
     """
-    url = f"http://{node}/internal/kv/{key}"
+    if timeout is not None:
+        return timeout, None
+    action, timeout, context = _timeout_bandit.select(node)
+    return timeout, (action, context)
 
-    try:
-        resp = requests.put(url, json=payload, timeout=timeout)
-        success = resp.status_code == 200
-        
-        if success:
-            _failure_detector.record_success(node)
-            get_metrics().record_node_response(node, success=True)
-        else:
-            _failure_detector.record_failure(node, FailureType.NETWORK_ERROR)
-            get_metrics().record_node_response(node, success=False)
-        
-        return success
-    except requests.Timeout:
-        _failure_detector.record_failure(node, FailureType.TIMEOUT)
-        get_metrics().record_node_response(node, success=False, timeout=True)
-        return False
-    except requests.RequestException:
-        _failure_detector.record_failure(node, FailureType.NETWORK_ERROR)
-        get_metrics().record_node_response(node, success=False)
-        return False
+
+def _learn_timeout(node: str, choice: Optional[tuple], success: bool):
+    """
+    Feed the outcome of a request back to the timeout bandit.
+    """
+    if choice is not None:
+        action, context = choice
+        _timeout_bandit.update(node, action, context, success)
 
 
-def send_get(node: str, key: str, timeout: float = DEFAULT_REQUEST_TIMEOUT) -> List[Dict[str, Any]]:
+def _call(
+    node: str,
+    method: str,
+    path: str,
+    payload: Any = None,
+    timeout: Optional[float] = None,
+    record: bool = True
+) -> Optional[Dict[str, Any]]:
     """
-    Send GET request to another node.
-    Returns list of versions or empty list on failure.
+    Send an internal RPC to another node and record the outcome with the
+    failure detector, metrics and timeout bandit.
+    If no timeout is given, an adaptive per-node timeout is used.
+    With record=False (liveness probes) only the failure detector is told, and
+    the default request timeout is used, so probes don't skew request metrics.
+    Returns the decoded response body, or None on failure.
     """
-    url = f"http://{node}/internal/kv/{key}"
+    url = f"http://{node}{path}"
+    data = msgpack.packb(payload) if payload is not None else None
+    if record:
+        timeout, choice = _select_timeout(node, timeout)
+    else:
+        timeout, choice = timeout or DEFAULT_REQUEST_TIMEOUT, None
+    metrics = get_metrics() if record else None
+    start_time = time.time()
+    success = False
 
     try:
-        resp = requests.get(url, timeout=timeout)
+        resp = _session.request(method, url, data=data, headers=_HEADERS, timeout=timeout)
         if resp.status_code == 200:
+            body = msgpack.unpackb(resp.content, raw=False)
+            success = True
             _failure_detector.record_success(node)
-            get_metrics().record_node_response(node, success=True)
-            return resp.json().get("versions", [])
+            if metrics is not None:
+                metrics.record_node_response(
+                    node, success=True, latency_ms=format_latency_ms(time.time() - start_time)
+                )
+            return body
         else:
             _failure_detector.record_failure(node, FailureType.NETWORK_ERROR)
-            get_metrics().record_node_response(node, success=False)
-            return []
+            if metrics is not None:
+                metrics.record_node_response(node, success=False)
+            return None
     except requests.Timeout:
         _failure_detector.record_failure(node, FailureType.TIMEOUT)
-        get_metrics().record_node_response(node, success=False, timeout=True)
-        return []
-    except requests.RequestException:
+        if metrics is not None:
+            metrics.record_node_response(
+                node, success=False, timeout=True, latency_ms=format_latency_ms(time.time() - start_time)
+            )
+        return None
+    except (requests.RequestException, ValueError):
         _failure_detector.record_failure(node, FailureType.NETWORK_ERROR)
-        get_metrics().record_node_response(node, success=False)
-        return []
+        if metrics is not None:
+            metrics.record_node_response(node, success=False)
+        return None
+    finally:
+        _learn_timeout(node, choice, success)
+
+
+def send_put(node: str, key: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> bool:
+    """
+    Send PUT request to another node.
+    Returns True if successful, False otherwise.
+    """
+    return _call(node, "PUT", f"/internal/kv/{key}", payload, timeout) is not None
+
+
+def send_get(node: str, key: str, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Send GET request to another node.
+    Returns list of versions, or None on failure so callers can tell
+    an unreachable replica apart from one that has no data.
+    """
+    body = _call(node, "GET", f"/internal/kv/{key}", timeout=timeout)
+    if body is None:
+        return None
+    return body.get("versions", [])
+
+
+def send_mget(node: str, keys: List[str], timeout: Optional[float] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    Fetch all versions of several keys from another node in one request.
+    Returns key -> list of versions, or None on failure.
+    """
+    body = _call(node, "POST", "/internal/kv:mget", {"keys": list(keys)}, timeout)
+    if body is None:
+        return None
+    return body.get("results", {})
+
+
+def send_mput(node: str, items: Dict[str, List[Dict[str, Any]]], timeout: Optional[float] = None) -> bool:
+    """
+    Store versions for several keys on another node in one request.
+    items: key -> list of versioned values.
+    Returns True if successful, False otherwise.
+    """
+    return _call(node, "POST", "/internal/kv:mput", {"items": items}, timeout) is not None
+
+
+def send_put_batch(node: str, key: str, versions: List[Dict[str, Any]], timeout: Optional[float] = None) -> bool:
+    """
+    Store several versions of one key on another node in one request.
+    Returns True if successful, False otherwise.
+    """
+    return send_mput(node, {key: versions}, timeout)
+
+
+def send_ping(node: str, timeout: Optional[float] = None) -> bool:
+    """
+    Probe another node's liveness.
+    Only the failure detector sees the outcome (not metrics or the timeout bandit).
+    Returns True if it answered, False otherwise.
+    """
+    return _call(node, "GET", "/internal/ping", timeout=timeout, record=False) is not None
 
 
 def get_failure_detector() -> FailureDetector:
     """
     Get the global failure detector instance.
     """
-    return _failure_detector
\ No newline at end of file
+    return _failure_detector
+
+
+def get_timeout_bandit() -> TimeoutBandit:
+    """
+    Get the global adaptive timeout selector.
+    """
+    return _timeout_bandit
\ No newline at end of file
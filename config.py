@@ -14,8 +14,29 @@ DEFAULT_HOST = "0.0.0.0"
 # Request timeout configuration (in seconds)
 DEFAULT_REQUEST_TIMEOUT = 0.3
 
+# Failure detection: seconds between background liveness probes of each peer
+PROBE_INTERVAL = 1.0
+
+# Adaptive per-node timeouts (seconds) the timeout bandit chooses between
+TIMEOUT_ACTIONS = (0.075, 0.15, 0.3, 0.6, 1.2)
+TIMEOUT_BANDIT_ALPHA = 0.5  # LinUCB exploration strength
+
+# Node-to-node HTTP connection pool sizing
+RPC_POOL_CONNECTIONS = 64  # Number of per-host pools to keep
+RPC_POOL_MAXSIZE = 64      # Hard cap on open connections per host (callers wait for a free one)
+
+# Replica fan-out configuration
+RPC_FANOUT_WORKERS = 32         # Worker threads shared by all coordinator fan-outs
+DEFAULT_FANOUT_TIMEOUT = 2.5    # Upper bound (seconds) on waiting for a fan-out to finish
+DEFAULT_HEDGE_DELAY = 0.05      # Hedged-read delay (seconds) until replica latencies are known
+READ_REPAIR_WORKERS = 16        # Worker threads pushing read-repair writes in the background
+
+# Lock stripes in local storage (power of two; independent keys rarely contend)
+STORAGE_SHARDS = 64
+
 # Consistent hashing configuration
 DEFAULT_VNODES = 100  # Number of virtual nodes per physical node
+REPLICA_CACHE_SIZE = 65536  # Max (key, N) entries kept in the replica-list cache
 
 # Cluster membership (can be overridden at runtime)
 # Format: ["127.0.0.1:5001", "127.0.0.1:5002", "127.0.0.1:5003"]
@@ -1,11 +1,11 @@
-from vector_clock import compare, VCComparison
+from vector_clock import compare, merge, VCComparison
 
 def deduplicate_versions(versions):
     seen = set()
     unique = []
 
     for v in versions:
-        key = (v["value"], frozenset(v["vector_clock"].items()))
+        key = (v["value"], tuple(sorted(v["vector_clock"].items())))
         if key not in seen:
             seen.add(key)
             unique.append(v)
@@ -14,6 +14,20 @@ def deduplicate_versions(versions):
 
 
 def resolve_versions(versions):
+    # Common case: one version has seen every update (its clock equals the
+    # pointwise max of all clocks), so it dominates everything that differs.
+    max_clock = {}
+    for v in versions:
+        max_clock = merge(max_clock, v["vector_clock"])
+
+    latest = [
+        v for v in versions
+        if compare(v["vector_clock"], max_clock) == VCComparison.EQUAL
+    ]
+    if latest:
+        return deduplicate_versions(latest)
+
+    # Concurrent updates: fall back to pairwise dominance checks
     survivors = []
 
     for v in versions:
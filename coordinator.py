@@ -1,14 +1,82 @@
 import time
-from typing import Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, List, Optional
 from read_repair import perform_read_repair
 from replication import ReplicationManager
 from quorum import Quorum
 from vector_clock import increment, compare, VCComparison, merge
 from storage import Storage
-from client_rpc import send_put, send_get
+from client_rpc import send_put, send_get, get_failure_detector
 from conflict_resolution import resolve_versions
 from metrics import get_metrics
 from utils import format_latency_ms
+from config import (
+    RPC_FANOUT_WORKERS,
+    DEFAULT_FANOUT_TIMEOUT,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_REQUEST_TIMEOUT
+)
+
+
+# Shared worker pool used to contact replicas concurrently
+_executor = ThreadPoolExecutor(max_workers=RPC_FANOUT_WORKERS, thread_name_prefix="replica-rpc")
+
+
+def _gather(
+    futures: Dict[Future, str],
+    responses: Dict[str, Any],
+    done: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    timeout: float = DEFAULT_FANOUT_TIMEOUT,
+    cancel: bool = False
+) -> bool:
+    """
+    Collect replica RPC results into responses (node -> result) as they complete.
+    Failed reads (None) are left out. Stops as soon as done(responses) is True
+    (possibly before waiting at all). With cancel=True, calls that have not
+    started yet are then cancelled; only reads may opt in, since a cancelled
+    write never reaches its replica.
+
+    Returns True if done(responses) was satisfied.
+    """
+    satisfied = done is not None and done(responses)
+
+    if not satisfied:
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                result = future.result()
+                if result is not None:
+                    responses[futures[future]] = result
+                if done is not None and done(responses):
+                    satisfied = True
+                    break
+        except FuturesTimeoutError:
+            pass
+
+    if cancel:
+        for future in futures:
+            future.cancel()
+
+    return satisfied
+
+
+def _merge_clocks(versions: List[dict]) -> Dict[str, int]:
+    """
+    Pointwise-max merge of the vector clocks of all versions.
+    """
+    merged_vc = {}
+    for v in versions:
+        merged_vc = merge(merged_vc, v["vector_clock"])
+    return merged_vc
+
+
+def _latest_by_clock_total(versions: List[dict]) -> dict:
+    """
+    Return the version whose vector clock has the largest total
+    (first one wins on ties).
+    """
+    totals = [sum(v["vector_clock"].values()) for v in versions]
+    return versions[totals.index(max(totals))]
 
 
 class Coordinator:
@@ -26,32 +94,85 @@ class Coordinator:
         self.storage = storage
         self.replication = replication_manager
 
+    def _submit(self, rpc: Callable, replicas: List[str], *args) -> Dict[Future, str]:
+        """
+        Submit rpc(node, *args) for every remote replica.
+        Returns future -> node.
+        """
+        return {
+            _executor.submit(rpc, node, *args): node
+            for node in replicas
+            if node != self.node_id
+        }
+
+    def _select_replicas(self, key: str, n: int) -> List[str]:
+        """
+        Return the key's N replicas, replacing any the failure detector has marked
+        as failed with the next healthy nodes on the preference list.
+        Failed nodes are only used when there are not enough healthy ones.
+        """
+        replicas = self.replication.get_replicas(key, n)
+        detector = get_failure_detector()
+        if not any(detector.is_node_failed(node) for node in replicas):
+            return replicas
+
+        preference = self.replication.get_preference_list(key)
+        selected = [node for node in preference if not detector.is_node_failed(node)][:n]
+        if len(selected) < n:
+            selected += [node for node in preference if node not in selected][:n - len(selected)]
+        return selected
+
+    def _expected_latency(self, node: str) -> float:
+        """
+        EWMA response latency (ms) of a node; 0 for nodes not measured yet
+        so they get tried and measured.
+        """
+        latency = get_metrics().get_node_latency(node)
+        return latency["mean"] if latency is not None else 0.0
+
+    def _hedge_delay(self, nodes: List[str]) -> float:
+        """
+        How long to wait on the primary replicas before hedging a read,
+        based on their estimated p95 latency.
+        """
+        metrics = get_metrics()
+        estimates = [metrics.get_node_latency_p95(node) for node in nodes]
+        if not estimates or any(e is None for e in estimates):
+            return DEFAULT_HEDGE_DELAY
+        return min(max(estimates) / 1000.0, DEFAULT_REQUEST_TIMEOUT)
+
+    def _existing_versions(self, key: str, replicas: List[str], pre_read: bool = False) -> List[dict]:
+        """
+        All known versions of key (including tombstones) for seeding a write's clock.
+        Local versions suffice when this node is a replica that holds the key;
+        otherwise (non-replica coordinator, or nothing stored locally), or when
+        pre_read is set, the replicas are pre-read so the new clock still
+        descends from their versions.
+        """
+        existing_versions = list(self.storage.get_all(key))
+        if not pre_read and self.node_id in replicas and existing_versions:
+            return existing_versions
+
+        remote_responses: Dict[str, List[dict]] = {}
+        _gather(self._submit(send_get, replicas, key), remote_responses)
+        for remote_versions in remote_responses.values():
+            existing_versions.extend(remote_versions)
+        return existing_versions
+
     # ---------------- WRITE PATH ---------------- #
 
     def handle_put(self, key: str, value, n: int, w: int) -> bool:
         start_time = time.time()
         metrics = get_metrics()
 
-        replicas = self.replication.get_replicas(key, n)
+        replicas = self._select_replicas(key, n)
+
+        # Seed the new clock from existing versions (including tombstones);
+        # remote replicas are only pre-read when local versions can't be trusted
+        existing_versions = self._existing_versions(key, replicas)
 
-        # Fetch existing versions (including tombstones) from all replicas to merge vector clocks properly
-        existing_versions = []
-        
-        # Get all local versions including tombstones
-        local_versions = self.storage.get_all(key)
-        existing_versions.extend(local_versions)
-        
-        # Fetch all versions from other replicas (including tombstones for vector clock merging)
-        for node in replicas:
-            if node != self.node_id:
-                # send_get now returns all versions including tombstones (via internal_get)
-                remote_versions = send_get(node, key)
-                existing_versions.extend(remote_versions)
-        
         # Merge all existing vector clocks
-        merged_vc = {}
-        for v in existing_versions:
-            merged_vc = merge(merged_vc, v["vector_clock"])
+        merged_vc = _merge_clocks(existing_versions)
 
         new_vc = increment(merged_vc, self.node_id)
 
@@ -61,13 +182,15 @@ class Coordinator:
         }
 
         responses: Dict[str, bool] = {}
+        futures = self._submit(send_put, replicas, key, payload)
 
-        for node in replicas:
-            if node == self.node_id:
-                self.storage.put(key, payload)
-                responses[node] = True
-            else:
-                responses[node] = send_put(node, key, payload)
+        if self.node_id in replicas:
+            self.storage.put(key, payload)
+            responses[self.node_id] = True
+
+        # Return as soon as W replicas have acknowledged; the remaining sends
+        # keep running in the background so every replica still gets the write
+        _gather(futures, responses, lambda acks: Quorum.wait_for_write_quorum(acks, w), cancel=False)
 
         success = Quorum.wait_for_write_quorum(responses, w)
         
@@ -83,18 +206,36 @@ class Coordinator:
         start_time = time.time()
         metrics = get_metrics()
 
-        replicas = self.replication.get_replicas(key, n)
+        replicas = self._select_replicas(key, n)
         responses: Dict[str, List[dict]] = {}
 
-        # Get all versions including tombstones from all replicas
-        for node in replicas:
-            if node == self.node_id:
-                # Get all versions including tombstones for internal processing
-                all_versions = self.storage.get_all(key)
-                responses[node] = all_versions
-            else:
-                # send_get calls internal_get which now returns all versions including tombstones
-                responses[node] = send_get(node, key)
+        # Contact just enough remote replicas to reach R, fastest first; the rest
+        # are held back as hedge candidates in case a primary is slow
+        remote = sorted(
+            (node for node in replicas if node != self.node_id),
+            key=self._expected_latency
+        )
+        needed = max(r - (1 if self.node_id in replicas else 0), 0)
+        primaries, backups = remote[:needed], remote[needed:]
+
+        futures = self._submit(send_get, primaries, key)
+
+        if self.node_id in replicas:
+            # Get all versions including tombstones for internal processing
+            responses[self.node_id] = self.storage.get_all(key)
+
+        # Stop waiting once R replicas have answered
+        def read_quorum_met(replies):
+            return len(replies) >= r
+
+        if backups and not _gather(
+            futures, responses, read_quorum_met,
+            timeout=self._hedge_delay(primaries), cancel=False
+        ):
+            # Primaries are slow or failing: hedge by asking the remaining replicas
+            futures.update(self._submit(send_get, backups, key))
+
+        _gather(futures, responses, read_quorum_met, cancel=True)
 
         read_versions, quorum_met = Quorum.collect_read_quorum(responses, r)
         
@@ -114,10 +255,9 @@ class Coordinator:
         # The latest version (by vector clock) wins
         if resolved_tombstones and resolved_non_tombstones:
             # Compare the latest tombstone with latest non-tombstone
-            latest_tombstone = max(resolved_tombstones, 
-                                 key=lambda v: sum(v["vector_clock"].values()))
-            latest_non_tombstone = max(resolved_non_tombstones,
-                                     key=lambda v: sum(v["vector_clock"].values()))
+            # (clock totals are summed once per version, not per comparison)
+            latest_tombstone = _latest_by_clock_total(resolved_tombstones)
+            latest_non_tombstone = _latest_by_clock_total(resolved_non_tombstones)
             
             comparison = compare(latest_tombstone["vector_clock"], 
                                 latest_non_tombstone["vector_clock"])
@@ -135,41 +275,29 @@ class Coordinator:
             # Only non-tombstones - key exists
             resolved_versions = resolved_non_tombstones
         
-        # If latest version is a tombstone, return empty to client
-        if resolved_versions and all(v.get("deleted", False) for v in resolved_versions):
-            # Perform read repair with tombstones to propagate deletion
-            perform_read_repair(
-                key=key,
-                latest_versions=resolved_versions,
-                replica_responses=responses
-            )
-            metrics.record_read(format_latency_ms(time.time() - start_time), quorum_met)
-            return []
-        
-        # If we get here, we have non-tombstone versions
-        if not resolved_versions:
-            metrics.record_read(format_latency_ms(time.time() - start_time), quorum_met)
-            return []
-        
-        # Check for conflicts (multiple versions means conflict)
-        if len(resolved_versions) > 1:
-            metrics.record_conflict()
-        
-        # Check if read repair was needed
+        # Repair stale replicas exactly once, whether the winner is a tombstone
+        # (propagates the deletion) or live data
         repair_needed = perform_read_repair(
             key=key,
             latest_versions=resolved_versions,
             replica_responses=responses
         )
-        
+
         if repair_needed:
             metrics.record_read_repair()
 
+        # If latest version is a tombstone (or nothing exists), return empty to client
+        deleted = all(v.get("deleted", False) for v in resolved_versions)
+
+        # Check for conflicts (multiple versions means conflict)
+        if not deleted and len(resolved_versions) > 1:
+            metrics.record_conflict()
+
         # Record metrics
         latency_ms = format_latency_ms(time.time() - start_time)
         metrics.record_read(latency_ms, quorum_met)
 
-        return resolved_versions
+        return [] if deleted else resolved_versions
 
     # ---------------- DELETE PATH ---------------- #
 
@@ -181,24 +309,24 @@ class Coordinator:
         start_time = time.time()
         metrics = get_metrics()
 
-        replicas = self.replication.get_replicas(key, n)
+        replicas = self._select_replicas(key, n)
 
-        # Fetch existing versions (including tombstones) to merge vector clocks
-        existing_versions = []
-        # Get all versions including tombstones for proper vector clock merging
+        # Get all versions including tombstones for vector clock merging.
+        # If a local tombstone already covers every local clock (e.g. a re-delete)
+        # seed from local data alone; otherwise pre-read, since a tombstone seeded
+        # from stale local data would be concurrent with the newer remote value
+        # and reads would keep the value.
         local_versions = self.storage.get_all(key)
-        existing_versions.extend(local_versions)
-        
-        for node in replicas:
-            if node != self.node_id:
-                # send_get now returns all versions including tombstones (via internal_get)
-                remote_versions = send_get(node, key)
-                existing_versions.extend(remote_versions)
-        
-        # Merge vector clocks
-        merged_vc = {}
-        for v in existing_versions:
-            merged_vc = merge(merged_vc, v["vector_clock"])
+        merged_vc = _merge_clocks(local_versions)
+        if not any(
+            v.get("deleted", False)
+            and compare(v["vector_clock"], merged_vc) == VCComparison.EQUAL
+            for v in local_versions
+        ):
+            existing_versions = self._existing_versions(key, replicas, pre_read=True)
+
+            # Merge vector clocks
+            merged_vc = _merge_clocks(existing_versions)
 
         new_vc = increment(merged_vc, self.node_id)
 
@@ -210,14 +338,15 @@ class Coordinator:
         }
 
         responses: Dict[str, bool] = {}
+        futures = self._submit(send_put, replicas, key, tombstone)
 
-        for node in replicas:
-            if node == self.node_id:
-                # Store tombstone locally
-                self.storage.put(key, tombstone)
-                responses[node] = True
-            else:
-                responses[node] = send_put(node, key, tombstone)
+        if self.node_id in replicas:
+            # Store tombstone locally
+            self.storage.put(key, tombstone)
+            responses[self.node_id] = True
+
+        # Stop waiting at W acks, but let the tombstone reach every replica
+        _gather(futures, responses, lambda acks: Quorum.wait_for_write_quorum(acks, w), cancel=False)
 
         success = Quorum.wait_for_write_quorum(responses, w)
         
@@ -2,10 +2,12 @@
 Timeout handling and failure detection
 """
 
+import threading
 import time
+from collections import deque
 from typing import Callable, Optional, Any, Dict, List
 from enum import Enum
-from config import DEFAULT_REQUEST_TIMEOUT
+from config import DEFAULT_REQUEST_TIMEOUT, PROBE_INTERVAL
 
 
 class FailureType(Enum):
@@ -23,37 +25,40 @@ class FailureDetector:
 
     def __init__(self, timeout: float = DEFAULT_REQUEST_TIMEOUT):
         self.timeout = timeout
-        self.failure_history: Dict[str, List[float]] = {}  # node -> list of failure timestamps
+        self.failure_history: Dict[str, deque] = {}  # node -> failure timestamps within the window
         self.failure_threshold = 3  # Number of consecutive failures before marking as failed
+        self.failure_window = 60.0  # Seconds a failure counts towards the threshold
         self.failed_nodes: set = set()
+        # Guards the per-node histories; RPC outcomes arrive from many fan-out threads
+        self.lock = threading.Lock()
 
     def record_failure(self, node: str, failure_type: FailureType):
         """
         Record a failure for a node.
         """
-        if node not in self.failure_history:
-            self.failure_history[node] = []
+        now = time.time()
+        with self.lock:
+            history = self.failure_history.setdefault(node, deque())
 
-        self.failure_history[node].append(time.time())
+            # Drop failures that have aged out of the window
+            while history and now - history[0] >= self.failure_window:
+                history.popleft()
 
-        # Check if node should be marked as failed
-        recent_failures = [
-            ts for ts in self.failure_history[node]
-            if time.time() - ts < 60  # Last minute
-        ]
+            history.append(now)
 
-        if len(recent_failures) >= self.failure_threshold:
-            self.failed_nodes.add(node)
+            # Check if node should be marked as failed
+            if len(history) >= self.failure_threshold:
+                self.failed_nodes.add(node)
 
     def record_success(self, node: str):
         """
         Record a successful operation for a node.
         Clears failure history if node was previously failed.
         """
-        if node in self.failed_nodes:
-            self.failed_nodes.remove(node)
-        if node in self.failure_history:
-            self.failure_history[node] = []
+        with self.lock:
+            self.failed_nodes.discard(node)
+            if node in self.failure_history:
+                self.failure_history[node].clear()
 
     def is_node_failed(self, node: str) -> bool:
         """
@@ -65,7 +70,8 @@ class FailureDetector:
         """
         Get set of currently failed nodes.
         """
-        return self.failed_nodes.copy()
+        with self.lock:
+            return self.failed_nodes.copy()
 
 
 def with_timeout(
@@ -128,3 +134,26 @@ def check_quorum_availability(
     available_nodes = total_nodes - failed_nodes
     return available_nodes >= required_quorum
 
+
+def start_probing(
+    nodes: List[str],
+    probe: Callable[[str], bool],
+    interval: float = PROBE_INTERVAL
+) -> threading.Thread:
+    """
+    Periodically probe every node from a background daemon thread.
+    probe(node) is expected to record its outcome with the failure detector,
+    so nodes that receive no regular traffic are still tracked.
+    """
+    def loop():
+        while True:
+            for node in nodes:
+                try:
+                    probe(node)
+                except Exception:
+                    pass
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="failure-probe", daemon=True)
+    thread.start()
+    return thread
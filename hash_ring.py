@@ -1,7 +1,7 @@
-import hashlib
 import bisect
-from typing import List, Dict
+from typing import List, Dict, Set
 from config import DEFAULT_VNODES
+from utils import hash_key
 
 
 class HashRing:
@@ -17,36 +17,51 @@ class HashRing:
         self.vnodes = vnodes
         self.ring: Dict[int, str] = {}      # hash -> physical node
         self.sorted_keys: List[int] = []    # sorted hashes
+        self.nodes: Set[str] = set()        # physical nodes on the ring
+        self._vnode_hashes: Dict[str, List[int]] = {}  # node -> its vnode hashes
+        self.version = 0                    # bumped on every membership change
 
         for node in nodes:
             self.add_node(node)
 
     def _hash(self, key: str) -> int:
         """
-        Returns a 32-bit hash of the given key
+        Returns a 32-bit hash of the given key (see utils.hash_key).
         """
-        return int(hashlib.md5(key.encode()).hexdigest(), 16) % (2 ** 32)
+        return hash_key(key)
+
+    def _get_vnode_hashes(self, node: str) -> List[int]:
+        """
+        Return the node's vnode hashes, computing them only the first time
+        the node is seen so re-joins and removals skip re-hashing
+        """
+        hashes = self._vnode_hashes.get(node)
+        if hashes is None:
+            hashes = [self._hash(f"{node}#{i}") for i in range(self.vnodes)]
+            self._vnode_hashes[node] = hashes
+        return hashes
 
     def add_node(self, node: str):
         """
-        Add a physical node with multiple virtual nodes
+        Add a physical node with multiple virtual nodes.
+        Inserts all vnode hashes in one batch and re-sorts once.
         """
-        for i in range(self.vnodes):
-            vnode_key = f"{node}#{i}"
-            h = self._hash(vnode_key)
-            self.ring[h] = node
-            bisect.insort(self.sorted_keys, h)
+        new_hashes = self._get_vnode_hashes(node)
+        self.ring.update((h, node) for h in new_hashes)
+        self.sorted_keys = sorted(self.ring)
+        self.nodes.add(node)
+        self.version += 1
 
     def remove_node(self, node: str):
         """
         Remove a physical node and all its virtual nodes
         """
-        for i in range(self.vnodes):
-            vnode_key = f"{node}#{i}"
-            h = self._hash(vnode_key)
-            if h in self.ring:
-                self.ring.pop(h)
-                self.sorted_keys.remove(h)
+        to_remove = {h for h in self._get_vnode_hashes(node) if self.ring.get(h) == node}
+        for h in to_remove:
+            self.ring.pop(h)
+        self.sorted_keys = [h for h in self.sorted_keys if h not in to_remove]
+        self.nodes.discard(node)
+        self.version += 1
 
     def get_nodes_for_key(self, key: str, n: int) -> List[str]:
         """
@@ -2,18 +2,83 @@
 Performance and availability metrics
 """
 
+import math
 import time
+import traceback
 from typing import Dict, List, Optional
-from threading import RLock
-from collections import defaultdict, deque
+from threading import RLock, Thread
+from collections import Counter, deque
+from hdrh.histogram import HdrHistogram
+
+# Smoothing factor for per-node latency EWMA (higher reacts faster)
+NODE_LATENCY_ALPHA = 0.2
+
+# Largest latency the histograms track (microseconds); larger samples are clamped
+LATENCY_HIST_MAX_US = 60_000_000
+
+# Seconds between background folds of pending metric records
+METRICS_FLUSH_INTERVAL = 0.1
+
+# Max pending metric records; if the flusher falls behind, the oldest are dropped
+METRICS_MAX_PENDING = 100_000
+
+# Seconds a computed get_summary() result is reused
+SUMMARY_TTL = 0.25
+
+
+def _new_latency_histogram() -> HdrHistogram:
+    """Latency histogram in microseconds, 1us..LATENCY_HIST_MAX_US at 3 significant digits"""
+    return HdrHistogram(1, LATENCY_HIST_MAX_US, 3)
+
+
+def _record_latency(histogram: HdrHistogram, latency_ms: float):
+    """Record a latency (ms), clamped into the histogram's trackable range"""
+    histogram.record_value(min(max(int(latency_ms * 1000), 1), LATENCY_HIST_MAX_US))
+
+
+def _latency_stats(histogram: HdrHistogram, total_ms: float) -> Dict[str, float]:
+    """
+    avg/min/max/p95 (ms) from a latency histogram, O(buckets) with no sorting.
+    avg comes from the running total (exact, O(1)) rather than the buckets.
+    """
+    count = histogram.get_total_count()
+    if count == 0:
+        return {"avg": 0.0, "min": 0.0, "max": 0.0, "p95": 0.0}
+
+    return {
+        "avg": total_ms / count,
+        "min": histogram.get_min_value() / 1000.0,
+        "max": histogram.get_max_value() / 1000.0,
+        "p95": histogram.get_value_at_percentile(95) / 1000.0
+    }
+
+
+def _node_health(responses: Counter, node: str) -> Dict[str, float]:
+    """success/timeout rates for a node from the (node, outcome) response counter"""
+    success = responses[(node, "success")]
+    timeout = responses[(node, "timeout")]
+    total = success + timeout + responses[(node, "failure")]
+    if total == 0:
+        return {"success_rate": 0.0, "timeout_rate": 0.0}
+
+    return {
+        "success_rate": success / total,
+        "timeout_rate": timeout / total,
+        "total_requests": total
+    }
 
 
 class Metrics:
     """
     Tracks performance and availability metrics for the node.
+
+    record_* calls only append to a pending-event deque (atomic, no lock), so
+    the request path never contends on the metrics lock. A background thread
+    folds pending events into the aggregates every METRICS_FLUSH_INTERVAL;
+    get_summary() flushes first, other getters may lag by up to one interval.
     """
 
-    def __init__(self):
+    def __init__(self, flush_interval: float = METRICS_FLUSH_INTERVAL):
         # RLock avoids deadlocks when aggregated getters call other getters
         self.lock = RLock()
 
@@ -24,9 +89,11 @@ class Metrics:
         self.conflict_count = 0
         self.failure_count = 0
 
-        # Latency tracking (using deque for rolling window)
-        self.read_latencies: deque = deque(maxlen=1000)
-        self.write_latencies: deque = deque(maxlen=1000)
+        # Latency tracking (fixed-bucket histograms: O(1) record, no sample cap)
+        self.read_latencies = _new_latency_histogram()
+        self.write_latencies = _new_latency_histogram()
+        self.read_latency_total = 0.0   # Running sums (ms) for the average
+        self.write_latency_total = 0.0
 
         # Quorum success/failure tracking
         self.read_quorum_success = 0
@@ -34,87 +101,158 @@ class Metrics:
         self.write_quorum_success = 0
         self.write_quorum_failure = 0
 
-        # Node-specific metrics
-        self.node_responses: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: {"success": 0, "failure": 0, "timeout": 0}
-        )
+        # Node-specific metrics: (node, "success" | "failure" | "timeout") -> count
+        self.node_responses: Counter = Counter()
+
+        # Per-node response latency (exponentially weighted mean/variance, in ms)
+        self.node_latency_ewma: Dict[str, float] = {}
+        self.node_latency_ewmvar: Dict[str, float] = {}
+
+        # Last get_summary() result and when it was computed (monotonic seconds)
+        self._summary_cache: Optional[Dict] = None
+        self._summary_ts = 0.0
+
+        # Pending (apply_fn, args) records waiting to be folded in (bounded)
+        self._events: deque = deque(maxlen=METRICS_MAX_PENDING)
+        self.flush_interval = flush_interval
+        self._flusher = Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                # Keep the flusher alive: a bad record must not freeze metrics
+                traceback.print_exc()
+
+    def flush(self):
+        """Fold all pending records into the aggregated metrics"""
+        with self.lock:
+            events = self._events
+            while events:
+                try:
+                    apply, args = events.popleft()
+                except IndexError:
+                    break
+                apply(*args)
 
     def record_read(self, latency_ms: float, quorum_success: bool):
         """Record a read operation"""
-        with self.lock:
-            self.read_count += 1
-            self.read_latencies.append(latency_ms)
-            if quorum_success:
-                self.read_quorum_success += 1
-            else:
-                self.read_quorum_failure += 1
+        self._events.append((self._apply_read, (latency_ms, quorum_success)))
+
+    def _apply_read(self, latency_ms: float, quorum_success: bool):
+        self.read_count += 1
+        self.read_latency_total += latency_ms
+        _record_latency(self.read_latencies, latency_ms)
+        if quorum_success:
+            self.read_quorum_success += 1
+        else:
+            self.read_quorum_failure += 1
 
     def record_write(self, latency_ms: float, quorum_success: bool):
         """Record a write operation"""
-        with self.lock:
-            self.write_count += 1
-            self.write_latencies.append(latency_ms)
-            if quorum_success:
-                self.write_quorum_success += 1
-            else:
-                self.write_quorum_failure += 1
+        self._events.append((self._apply_write, (latency_ms, quorum_success)))
+
+    def _apply_write(self, latency_ms: float, quorum_success: bool):
+        self.write_count += 1
+        self.write_latency_total += latency_ms
+        _record_latency(self.write_latencies, latency_ms)
+        if quorum_success:
+            self.write_quorum_success += 1
+        else:
+            self.write_quorum_failure += 1
 
     def record_read_repair(self):
         """Record a read repair operation"""
-        with self.lock:
-            self.read_repair_count += 1
+        self._events.append((self._apply_read_repair, ()))
+
+    def _apply_read_repair(self):
+        self.read_repair_count += 1
 
     def record_conflict(self):
         """Record a conflict detection"""
-        with self.lock:
-            self.conflict_count += 1
+        self._events.append((self._apply_conflict, ()))
+
+    def _apply_conflict(self):
+        self.conflict_count += 1
 
     def record_failure(self):
         """Record a general failure"""
-        with self.lock:
-            self.failure_count += 1
-
-    def record_node_response(self, node: str, success: bool, timeout: bool = False):
+        self._events.append((self._apply_failure, ()))
+
+    def _apply_failure(self):
+        self.failure_count += 1
+
+    def record_node_response(
+        self,
+        node: str,
+        success: bool,
+        timeout: bool = False,
+        latency_ms: Optional[float] = None
+    ):
         """Record a response from a specific node"""
-        with self.lock:
-            if timeout:
-                self.node_responses[node]["timeout"] += 1
-            elif success:
-                self.node_responses[node]["success"] += 1
-            else:
-                self.node_responses[node]["failure"] += 1
+        self._events.append((self._apply_node_response, (node, success, timeout, latency_ms)))
+
+    def _apply_node_response(
+        self,
+        node: str,
+        success: bool,
+        timeout: bool,
+        latency_ms: Optional[float]
+    ):
+        outcome = "timeout" if timeout else "success" if success else "failure"
+        self.node_responses[(node, outcome)] += 1
+
+        if latency_ms is not None:
+            self._update_node_latency(node, latency_ms)
+
+    def _update_node_latency(self, node: str, latency_ms: float):
+        """Fold a latency sample into the node's EWMA mean and variance"""
+        mean = self.node_latency_ewma.get(node)
+        if mean is None:
+            self.node_latency_ewma[node] = latency_ms
+            self.node_latency_ewmvar[node] = 0.0
+            return
+
+        diff = latency_ms - mean
+        incr = NODE_LATENCY_ALPHA * diff
+        self.node_latency_ewma[node] = mean + incr
+        self.node_latency_ewmvar[node] = (1 - NODE_LATENCY_ALPHA) * (
+            self.node_latency_ewmvar[node] + diff * incr
+        )
+
+    def get_node_latency(self, node: str) -> Optional[Dict[str, float]]:
+        """
+        EWMA response latency (ms) for a node as {"mean", "stddev"}.
+        Returns None if no samples have been recorded yet.
+        Lock-free: called on the request path, and single dict reads are atomic.
+        """
+        mean = self.node_latency_ewma.get(node)
+        if mean is None:
+            return None
+        return {"mean": mean, "stddev": math.sqrt(self.node_latency_ewmvar.get(node, 0.0))}
+
+    def get_node_latency_p95(self, node: str) -> Optional[float]:
+        """
+        Rough p95 response latency (ms) for a node, estimated as EWMA + 2 std devs.
+        Returns None if no samples have been recorded yet.
+        """
+        latency = self.get_node_latency(node)
+        if latency is None:
+            return None
+        return latency["mean"] + 2 * latency["stddev"]
 
     def get_read_latency_stats(self) -> Dict[str, float]:
         """Get read latency statistics"""
         with self.lock:
-            if not self.read_latencies:
-                return {"avg": 0.0, "min": 0.0, "max": 0.0, "p95": 0.0}
-
-            latencies = list(self.read_latencies)
-            latencies.sort()
-
-            return {
-                "avg": sum(latencies) / len(latencies),
-                "min": latencies[0],
-                "max": latencies[-1],
-                "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0
-            }
+            return _latency_stats(self.read_latencies, self.read_latency_total)
 
     def get_write_latency_stats(self) -> Dict[str, float]:
         """Get write latency statistics"""
         with self.lock:
-            if not self.write_latencies:
-                return {"avg": 0.0, "min": 0.0, "max": 0.0, "p95": 0.0}
-
-            latencies = list(self.write_latencies)
-            latencies.sort()
-
-            return {
-                "avg": sum(latencies) / len(latencies),
-                "min": latencies[0],
-                "max": latencies[-1],
-                "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0
-            }
+            return _latency_stats(self.write_latencies, self.write_latency_total)
 
     def get_read_success_rate(self) -> float:
         """Get read quorum success rate"""
@@ -133,59 +271,77 @@ class Metrics:
             return self.write_quorum_success / total
 
     def get_node_health(self, node: str) -> Dict[str, float]:
-        """Get health metrics for a specific node"""
-        with self.lock:
-            stats = self.node_responses[node]
-            total = stats["success"] + stats["failure"] + stats["timeout"]
-            if total == 0:
-                return {"success_rate": 0.0, "timeout_rate": 0.0}
-
-            return {
-                "success_rate": stats["success"] / total,
-                "timeout_rate": stats["timeout"] / total,
-                "total_requests": total
-            }
+        """
+        Get health metrics for a specific node.
+        Lock-free (used on the request path); counters may be up to one flush behind.
+        """
+        return _node_health(self.node_responses, node)
 
     def get_summary(self) -> Dict:
-        """Get a summary of all metrics"""
+        """
+        Get a summary of all metrics.
+        Only the flush and a snapshot happen under the lock (latency stats are
+        cheap bucket scans); per-node rates are computed afterwards so reporting
+        doesn't hold up the background flush.
+        Results are cached for SUMMARY_TTL seconds, so frequent scrapes are O(1).
+        """
+        now = time.monotonic()
+        cached = self._summary_cache
+        if cached is not None and now - self._summary_ts < SUMMARY_TTL:
+            return cached
+
         with self.lock:
-            return {
-                "operations": {
-                    "reads": self.read_count,
-                    "writes": self.write_count,
-                    "read_repairs": self.read_repair_count,
-                    "conflicts": self.conflict_count,
-                    "failures": self.failure_count
-                },
-                "quorum_rates": {
-                    "read_success_rate": self.get_read_success_rate(),
-                    "write_success_rate": self.get_write_success_rate()
-                },
-                "latency": {
-                    "read": self.get_read_latency_stats(),
-                    "write": self.get_write_latency_stats()
-                },
-                "node_health": {
-                    node: self.get_node_health(node)
-                    for node in self.node_responses.keys()
-                }
+            self.flush()
+            operations = {
+                "reads": self.read_count,
+                "writes": self.write_count,
+                "read_repairs": self.read_repair_count,
+                "conflicts": self.conflict_count,
+                "failures": self.failure_count
+            }
+            quorum_rates = {
+                "read_success_rate": self.get_read_success_rate(),
+                "write_success_rate": self.get_write_success_rate()
+            }
+            latency = {
+                "read": _latency_stats(self.read_latencies, self.read_latency_total),
+                "write": _latency_stats(self.write_latencies, self.write_latency_total)
+            }
+            node_responses = self.node_responses.copy()
+
+        summary = {
+            "operations": operations,
+            "quorum_rates": quorum_rates,
+            "latency": latency,
+            "node_health": {
+                node: _node_health(node_responses, node)
+                for node in dict.fromkeys(node for node, _ in node_responses)
             }
+        }
+        self._summary_cache, self._summary_ts = summary, now
+        return summary
 
     def reset(self):
         """Reset all metrics"""
         with self.lock:
+            self._events.clear()
+            self._summary_cache = None
             self.read_count = 0
             self.write_count = 0
             self.read_repair_count = 0
             self.conflict_count = 0
             self.failure_count = 0
-            self.read_latencies.clear()
-            self.write_latencies.clear()
+            self.read_latencies.reset()
+            self.write_latencies.reset()
+            self.read_latency_total = 0.0
+            self.write_latency_total = 0.0
             self.read_quorum_success = 0
             self.read_quorum_failure = 0
             self.write_quorum_success = 0
             self.write_quorum_failure = 0
             self.node_responses.clear()
+            self.node_latency_ewma.clear()
+            self.node_latency_ewmvar.clear()
 
 
 # Global metrics instance (can be shared across modules)
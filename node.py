@@ -5,15 +5,41 @@ from storage import Storage
 from replication import ReplicationManager
 from coordinator import Coordinator
 from api import create_app
+from client_rpc import send_ping
+from config import DEFAULT_HOST
+from failure import start_probing
+
+
+def run_gunicorn(app, port: int, threads: int, on_start):
+    """
+    Serve the app with gunicorn's threaded worker instead of the Flask dev server.
+    A single worker process is used because storage lives in process memory.
+    on_start runs inside the worker process, before it starts serving.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class NodeApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{DEFAULT_HOST}:{port}")
+            self.cfg.set("workers", 1)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", threads)
+
+        def load(self):
+            on_start()
+            return app
+
+    NodeApplication().run()
 
 
 def main():
     """
     Usage:
-      python node.py --port <port> [--nodes <node1,node2,node3>]
+      python node.py --port <port> [--nodes <node1,node2,node3>] [--server flask|gunicorn] [--threads <n>]
     Example:
       python node.py --port 5001
       python node.py --port 5001 --nodes 127.0.0.1:5001,127.0.0.1:5002,127.0.0.1:5003
+      python node.py --port 5001 --server gunicorn --threads 64
       
     Legacy format (still supported):
       python node.py <node_id> <port> <node_list>
@@ -23,6 +49,10 @@ def main():
     parser.add_argument('--nodes', type=str, 
                        default='127.0.0.1:5001,127.0.0.1:5002,127.0.0.1:5003',
                        help='Comma-separated list of all nodes in cluster')
+    parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask',
+                       help='HTTP server to run the node with')
+    parser.add_argument('--threads', type=int, default=64,
+                       help='Worker threads when running under gunicorn')
     
     # Support legacy positional arguments
     if len(sys.argv) > 1 and not sys.argv[1].startswith('--'):
@@ -31,6 +61,7 @@ def main():
             node_id = sys.argv[1]
             port = int(sys.argv[2])
             nodes = sys.argv[3].split(",")
+            server, threads = 'flask', 64
         else:
             print("Usage: python node.py <node_id> <port> <node_list>")
             print("   or: python node.py --port <port> [--nodes <node_list>]")
@@ -45,6 +76,7 @@ def main():
         port = args.port
         node_id = f"127.0.0.1:{port}"
         nodes = args.nodes.split(",")
+        server, threads = args.server, args.threads
 
     # ---------- Initialize Core Components ----------
 
@@ -60,8 +92,19 @@ def main():
 
     app = create_app(coordinator)
 
+    # Probe peers in the background so failed replicas are detected
+    # (and skipped by the coordinator) even when they receive no traffic
+    peers = [node for node in nodes if node != node_id]
+
+    def start_background_tasks():
+        start_probing(peers, send_ping)
+
     print(f"[INFO] Node {node_id} starting on port {port}")
-    app.run(host="0.0.0.0", port=port, threaded=True)
+    if server == 'gunicorn':
+        run_gunicorn(app, port, threads, start_background_tasks)
+    else:
+        start_background_tasks()
+        app.run(host=DEFAULT_HOST, port=port, threaded=True)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 from typing import Dict, Any, List, Tuple
+import itertools
 import time
 
 
@@ -15,7 +16,18 @@ class Quorum:
         """
         responses: node -> response (success/failure)
         """
-        success_count = sum(1 for r in responses.values() if r is True)
+        # Stop as soon as the outcome is decided: W acks seen, or too few
+        # responses left to reach W
+        success_count = 0
+        remaining = len(responses)
+        for r in responses.values():
+            remaining -= 1
+            if r is True:
+                success_count += 1
+                if success_count >= required_w:
+                    return True
+            elif success_count + remaining < required_w:
+                return False
         return success_count >= required_w
 
     @staticmethod
@@ -24,26 +36,19 @@ class Quorum:
         required_r: int
     ) -> Tuple[List[Any], bool]:
         """
-        responses: node -> read_result (list of versions)
+        responses: node -> read_result (list or tuple of versions)
         Collects from all nodes and flattens versions.
         Ensures at least R nodes responded (even if with empty lists).
         
         Returns: (all_versions, quorum_met)
         """
-        all_versions = []
-        responding_nodes = 0
-        
-        for value in responses.values():
-            if value is not None:
-                responding_nodes += 1
-                # value is a list of versions, flatten it
-                if isinstance(value, list):
-                    all_versions.extend(value)
-                else:
-                    all_versions.append(value)
-        
-        # Check if we have at least R nodes that responded
-        quorum_met = responding_nodes >= required_r
-        
-        # Return all collected versions (collect all for read repair) and quorum status
+        # Only nodes that answered count towards R (even with empty lists)
+        values = [v for v in responses.values() if v is not None]
+        quorum_met = len(values) >= required_r
+
+        # Flatten every node's versions in one pass (collect all for read repair)
+        all_versions = list(itertools.chain.from_iterable(
+            v if isinstance(v, (list, tuple)) else (v,) for v in values
+        ))
+
         return all_versions, quorum_met
@@ -1,5 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
 from vector_clock import compare, VCComparison
-from client_rpc import send_put
+from client_rpc import send_put_batch
+from config import READ_REPAIR_WORKERS
+
+
+# Repairs are best-effort, so they are pushed from a background pool
+# instead of holding up the read that detected them
+_repair_pool = ThreadPoolExecutor(max_workers=READ_REPAIR_WORKERS, thread_name_prefix="read-repair")
+
+
+def _clock_signature(vc):
+    """
+    Hashable form of a vector clock; two clocks compare EQUAL iff their
+    signatures match (zero counters are dropped, as compare() treats them as absent).
+    """
+    return frozenset((node, count) for node, count in vc.items() if count)
+
 
 def perform_read_repair(key, latest_versions, replica_responses):
     """
@@ -7,11 +23,13 @@ def perform_read_repair(key, latest_versions, replica_responses):
     latest_versions: list of latest version dicts after conflict resolution
     
     Repairs all replica nodes by ensuring they have the latest versions.
+    Each stale node gets all latest versions in a single batched RPC; the
+    RPCs are dispatched concurrently on a background pool (fire-and-forget).
     - If a node has no data (empty list), send all latest versions
     - If a node has outdated versions, send the latest versions
     - Handles tombstones properly (propagates deletions)
     
-    Returns True if any repair was performed, False otherwise.
+    Returns True if any repair was scheduled, False otherwise.
     """
     if not latest_versions:
         return False
@@ -20,7 +38,10 @@ def perform_read_repair(key, latest_versions, replica_responses):
     # If so, we need to propagate tombstones to all nodes
     all_tombstones = all(v.get("deleted", False) for v in latest_versions)
     
-    repair_performed = False
+    # Signatures of the latest clocks, so "does this node have them?" is a set check
+    latest_sigs = {_clock_signature(v["vector_clock"]) for v in latest_versions}
+    
+    stale_nodes = []
     
     for node, versions in replica_responses.items():
         # Filter tombstones from node's versions for comparison
@@ -29,9 +50,7 @@ def perform_read_repair(key, latest_versions, replica_responses):
         
         # Case 1: Node has no data - send all latest versions (including tombstones)
         if not versions or len(versions) == 0:
-            for latest in latest_versions:
-                send_put(node, key, latest)
-            repair_performed = True
+            stale_nodes.append(node)
             continue
         
         # Case 2: If latest_versions are tombstones, ensure node has them
@@ -41,10 +60,11 @@ def perform_read_repair(key, latest_versions, replica_responses):
             for latest in latest_versions:
                 found = False
                 for v in node_tombstones:
-                    if compare(v["vector_clock"], latest["vector_clock"]) == VCComparison.EQUAL:
+                    comparison = compare(v["vector_clock"], latest["vector_clock"])
+                    if comparison == VCComparison.EQUAL:
                         found = True
                         break
-                    elif compare(v["vector_clock"], latest["vector_clock"]) == VCComparison.IS_DOMINATED:
+                    elif comparison == VCComparison.IS_DOMINATED:
                         needs_repair = True
                         break
                 if not found:
@@ -52,18 +72,14 @@ def perform_read_repair(key, latest_versions, replica_responses):
                     break
             
             if needs_repair:
-                for latest in latest_versions:
-                    send_put(node, key, latest)
-                repair_performed = True
+                stale_nodes.append(node)
             continue
         
         # Case 3: Node has tombstones but latest_versions are not tombstones
         # This means key was recreated after deletion - remove old tombstones
         if node_tombstones and not all_tombstones:
             # Node has outdated tombstones, needs repair
-            for latest in latest_versions:
-                send_put(node, key, latest)
-            repair_performed = True
+            stale_nodes.append(node)
             continue
         
         # Case 4: Node has data - check if any version is outdated
@@ -79,20 +95,14 @@ def perform_read_repair(key, latest_versions, replica_responses):
         
         # Case 5: Node is missing latest versions (check if latest versions exist in node)
         if not needs_repair:
-            for latest in latest_versions:
-                found = False
-                for v in node_non_tombstones:
-                    if compare(v["vector_clock"], latest["vector_clock"]) == VCComparison.EQUAL:
-                        found = True
-                        break
-                if not found:
-                    needs_repair = True
-                    break
+            node_sigs = {_clock_signature(v["vector_clock"]) for v in node_non_tombstones}
+            needs_repair = not latest_sigs <= node_sigs
         
-        # Send all latest versions if repair is needed
+        # Queue the node for repair if needed
         if needs_repair:
-            for latest in latest_versions:
-                send_put(node, key, latest)
-            repair_performed = True
+            stale_nodes.append(node)
+    
+    for node in stale_nodes:
+        _repair_pool.submit(send_put_batch, node, key, latest_versions)
     
-    return repair_performed
+    return bool(stale_nodes)
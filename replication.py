@@ -1,5 +1,8 @@
-from typing import List
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Tuple
 from hash_ring import HashRing
+from config import REPLICA_CACHE_SIZE
 
 
 class ReplicationManager:
@@ -7,11 +10,45 @@ class ReplicationManager:
     Responsible for selecting replica nodes for a given key.
     """
 
-    def __init__(self, hash_ring: HashRing):
+    def __init__(self, hash_ring: HashRing, cache_size: int = REPLICA_CACHE_SIZE):
         self.hash_ring = hash_ring
+        self.cache_size = cache_size
+        # LRU of (key, n) -> replicas, valid for a single ring version
+        self._cache: "OrderedDict[Tuple[str, int], List[str]]" = OrderedDict()
+        self._cache_version = hash_ring.version
+        self._lock = Lock()
 
     def get_replicas(self, key: str, n: int) -> List[str]:
         """
         Return N unique physical nodes responsible for the key.
         """
-        return self.hash_ring.get_nodes_for_key(key, n)
+        cache_key = (key, n)
+
+        with self._lock:
+            if self._cache_version != self.hash_ring.version:
+                # Ring membership changed, every cached placement is stale
+                self._cache.clear()
+                self._cache_version = self.hash_ring.version
+            else:
+                replicas = self._cache.get(cache_key)
+                if replicas is not None:
+                    self._cache.move_to_end(cache_key)
+                    return list(replicas)
+
+        version = self.hash_ring.version
+        replicas = self.hash_ring.get_nodes_for_key(key, n)
+
+        with self._lock:
+            if version == self._cache_version == self.hash_ring.version:
+                self._cache[cache_key] = replicas
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return list(replicas)
+
+    def get_preference_list(self, key: str) -> List[str]:
+        """
+        Return every physical node in ring order for the key.
+        The first N are the key's replicas; the rest are fallbacks.
+        """
+        return self.get_replicas(key, len(self.hash_ring.nodes))
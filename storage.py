@@ -1,16 +1,33 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from threading import Lock
+from config import STORAGE_SHARDS
+from vector_clock import compare, VCComparison
 
 
 class Storage:
     """
     In-memory key-value store.
     Each key can have multiple versions (siblings).
+    Keys are striped across STORAGE_SHARDS dicts, each with its own lock,
+    so operations on unrelated keys don't serialize on one lock.
+    A key's versions are an immutable tuple replaced on every write
+    (copy-on-write), so reads need no lock and no copy. Writes compact the
+    tuple to the versions no other version dominates, so it stays as small
+    as the set of concurrent siblings.
     """
 
-    def __init__(self):
-        self.store: Dict[str, List[dict]] = {}
-        self.lock = Lock()
+    def __init__(self, shards: int = STORAGE_SHARDS):
+        assert shards & (shards - 1) == 0, "shard count must be a power of two"
+        self._mask = shards - 1
+        self.shards: List[Dict[str, Tuple[dict, ...]]] = [{} for _ in range(shards)]
+        self.locks = [Lock() for _ in range(shards)]
+
+    def _shard(self, key: str) -> Tuple[Lock, Dict[str, Tuple[dict, ...]]]:
+        """
+        Return the (lock, dict) stripe that owns key.
+        """
+        i = hash(key) & self._mask
+        return self.locks[i], self.shards[i]
 
     def put(self, key: str, versioned_value: dict):
         """
@@ -20,14 +37,24 @@ class Storage:
             "value": any,
             "vector_clock": dict
         }
+        Versions the new one dominates are dropped; a new version that is
+        dominated by (or equal to) a stored one is ignored, as reads would
+        discard it anyway.
         """
-        with self.lock:
-            if key not in self.store:
-                self.store[key] = []
-
-            self.store[key].append(versioned_value)
+        new_vc = versioned_value["vector_clock"]
+        lock, store = self._shard(key)
+        with lock:
+            kept = []
+            for v in store.get(key, ()):
+                comparison = compare(new_vc, v["vector_clock"])
+                if comparison == VCComparison.CONCURRENT:
+                    kept.append(v)
+                elif comparison != VCComparison.DOMINATES:
+                    return
+            kept.append(versioned_value)
+            store[key] = tuple(kept)
 
-    def get(self, key: str, include_tombstones: bool = False) -> List[dict]:
+    def get(self, key: str, include_tombstones: bool = False) -> Tuple[dict, ...]:
         """
         Return all versions for a key.
         Filters out tombstones (deleted markers) by default.
@@ -35,28 +62,31 @@ class Storage:
         Args:
             include_tombstones: If True, returns all versions including tombstones
         """
-        with self.lock:
-            versions = list(self.store.get(key, []))
-            if include_tombstones:
-                return versions
-            # Filter out tombstones for normal reads
-            return [v for v in versions if not v.get("deleted", False)]
+        _, store = self._shard(key)
+        versions = store.get(key, ())
+        if include_tombstones:
+            return versions
+        # Filter out tombstones for normal reads
+        return tuple(v for v in versions if not v.get("deleted", False))
     
-    def get_all(self, key: str) -> List[dict]:
+    def get_all(self, key: str) -> Tuple[dict, ...]:
         """
         Return all versions including tombstones (for internal operations).
+        The returned tuple is shared; callers must not mutate its versions.
         """
-        with self.lock:
-            return list(self.store.get(key, []))
+        _, store = self._shard(key)
+        return store.get(key, ())
 
     def overwrite(self, key: str, versions: List[dict]):
         """
         Replace all versions for a key (used after conflict resolution)
         """
-        with self.lock:
-            self.store[key] = versions
+        lock, store = self._shard(key)
+        with lock:
+            store[key] = tuple(versions)
 
     def delete(self, key: str):
-        with self.lock:
-            if key in self.store:
-                del self.store[key]
+        lock, store = self._shard(key)
+        with lock:
+            if key in store:
+                del store[key]
@@ -0,0 +1,120 @@
+"""
+Adaptive per-node request timeouts (LinUCB contextual bandit)
+"""
+
+from threading import Lock
+from typing import Dict, Sequence, Tuple
+import numpy as np
+from config import DEFAULT_REQUEST_TIMEOUT, TIMEOUT_ACTIONS, TIMEOUT_BANDIT_ALPHA
+from metrics import get_metrics
+
+
+class LinUCB:
+    """
+    Disjoint LinUCB: one ridge-regression reward model per action.
+    Keeps A^-1 directly (Sherman-Morrison update), so select/update are O(d^2).
+    """
+
+    def __init__(
+        self,
+        n_actions: int,
+        n_features: int,
+        alpha: float = TIMEOUT_BANDIT_ALPHA,
+        default_action: int = 0
+    ):
+        self.alpha = alpha
+        self.default_action = default_action
+        self.a_inv = [np.identity(n_features) for _ in range(n_actions)]
+        self.b = [np.zeros(n_features) for _ in range(n_actions)]
+
+    def select(self, x: np.ndarray) -> int:
+        """
+        Return the action with the highest upper confidence bound for context x.
+        Ties (e.g. every action on a cold start) go to default_action,
+        then to the lowest index.
+        """
+        best_action, best_score = 0, -np.inf
+        for action, (a_inv, b) in enumerate(zip(self.a_inv, self.b)):
+            a_inv_x = a_inv @ x
+            score = (a_inv @ b) @ x + self.alpha * np.sqrt(x @ a_inv_x)
+            if score > best_score or (score == best_score and action == self.default_action):
+                best_action, best_score = action, score
+        return best_action
+
+    def update(self, action: int, x: np.ndarray, reward: float):
+        """
+        Fold an observed reward for (action, x) into the model.
+        """
+        a_inv = self.a_inv[action]
+        a_inv_x = a_inv @ x
+        self.a_inv[action] = a_inv - np.outer(a_inv_x, a_inv_x) / (1.0 + x @ a_inv_x)
+        self.b[action] = self.b[action] + reward * x
+
+
+class TimeoutBandit:
+    """
+    Learns a request timeout per node.
+    Context: [bias, EWMA latency, latency std dev, recent failure rate].
+    Reward: 0 for a failed/timed-out call, otherwise 1 minus a penalty that grows
+    with the chosen timeout, so the tightest timeout that still succeeds wins.
+    """
+
+    N_FEATURES = 4
+
+    def __init__(self, actions: Sequence[float] = TIMEOUT_ACTIONS, alpha: float = TIMEOUT_BANDIT_ALPHA):
+        self.actions = tuple(actions)
+        self.alpha = alpha
+        self.max_timeout = max(self.actions)
+        # Until a node has history, use the action closest to the static default timeout
+        self.default_action = min(
+            range(len(self.actions)), key=lambda a: abs(self.actions[a] - DEFAULT_REQUEST_TIMEOUT)
+        )
+        self.models: Dict[str, LinUCB] = {}
+        self.lock = Lock()
+
+    def context(self, node: str) -> np.ndarray:
+        """
+        Build the context vector for a node from recorded metrics.
+        Latencies are scaled by the largest timeout to keep features in ~[0, 1].
+        """
+        metrics = get_metrics()
+        latency = metrics.get_node_latency(node)
+        health = metrics.get_node_health(node)
+
+        mean = stddev = 0.0
+        if latency is not None:
+            scale = self.max_timeout * 1000.0
+            mean = latency["mean"] / scale
+            stddev = latency["stddev"] / scale
+
+        failure_rate = 0.0
+        if health.get("total_requests"):
+            failure_rate = 1.0 - health["success_rate"]
+
+        return np.array([1.0, mean, stddev, failure_rate])
+
+    def select(self, node: str) -> Tuple[int, float, np.ndarray]:
+        """
+        Pick a timeout for the next request to node.
+        Returns (action, timeout_seconds, context); pass action and context back to update().
+        """
+        x = self.context(node)
+        with self.lock:
+            model = self.models.get(node)
+            if model is None:
+                model = self.models[node] = LinUCB(
+                    len(self.actions), self.N_FEATURES, self.alpha, self.default_action
+                )
+            action = model.select(x)
+        return action, self.actions[action], x
+
+    def update(self, node: str, action: int, x: np.ndarray, success: bool):
+        """
+        Record the outcome of a request made with the given action.
+        """
+        reward = 0.0
+        if success:
+            reward = 1.0 - 0.5 * self.actions[action] / self.max_timeout
+
+        with self.lock:
+            self.models[node].update(action, x, reward)
@@ -2,17 +2,18 @@
 Shared utility functions
 """
 
-import hashlib
-import json
+import orjson
+import xxhash
+from itertools import islice
 from typing import Any, Dict, List, Optional, Tuple
 
 
 def hash_key(key: str) -> int:
     """
-    Hash a key to a 32-bit integer.
-    Uses MD5 for consistent hashing.
+    Hash a key to a 32-bit integer (its position on the hash ring).
+    Uses xxh3: key placement only needs a uniform hash, not a cryptographic one.
     """
-    return int(hashlib.md5(key.encode()).hexdigest(), 16) % (2 ** 32)
+    return xxhash.xxh3_64_intdigest(key.encode() if isinstance(key, str) else key) & 0xFFFFFFFF
 
 
 def parse_node_id(node_str: str) -> Tuple[str, int]:
@@ -60,16 +61,17 @@ def ensure_quorum_consistency(n: int, r: int, w: int) -> bool:
 
 def serialize_value(value: Any) -> str:
     """
-    Serialize a value to JSON string.
+    Serialize a value to JSON string (orjson, C-implemented).
     """
-    return json.dumps(value)
+    # Non-str dict keys are stringified, as json.dumps does
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def deserialize_value(value_str: str) -> Any:
     """
-    Deserialize a JSON string to Python value.
+    Deserialize a JSON string (or bytes) to Python value.
     """
-    return json.loads(value_str)
+    return orjson.loads(value_str)
 
 
 def merge_dicts(dict1: Dict, dict2: Dict) -> Dict:
@@ -92,16 +94,9 @@ def get_first_n_unique(items: List, n: int) -> List:
     """
     Get first N unique items from a list.
     Preserves order.
+    dict.fromkeys dedups in one C-level pass (it reads all of items, so pass a list).
     """
-    seen = set()
-    result = []
-    for item in items:
-        if item not in seen:
-            seen.add(item)
-            result.append(item)
-            if len(result) >= n:
-                break
-    return result
+    return list(islice(dict.fromkeys(items), n))
 
 
 def safe_get(dictionary: Dict, key: str, default: Any = None) -> Any:
@@ -11,22 +11,24 @@ class VCComparison(Enum):
 
 def increment(vc: Dict[str, int], node_id: str) -> Dict[str, int]:
     """
-    Increment the vector clock for the given node
+    Increment the vector clock for the given node.
+    Builds the new clock in one dict display rather than copy + set.
     """
-    new_vc = vc.copy()
-    new_vc[node_id] = new_vc.get(node_id, 0) + 1
-    return new_vc
+    return {**vc, node_id: vc.get(node_id, 0) + 1}
 
 
 def merge(vc1: Dict[str, int], vc2: Dict[str, int]) -> Dict[str, int]:
     """
     Merge two vector clocks by taking max for each node
     """
-    merged = {}
-    all_nodes = set(vc1.keys()) | set(vc2.keys())
+    # Fast path: both clocks cover the same nodes (the usual case in a stable cluster)
+    if len(vc1) == len(vc2) and vc1.keys() == vc2.keys():
+        return {node: c1 if c1 > vc2[node] else vc2[node] for node, c1 in vc1.items()}
 
-    for node in all_nodes:
-        merged[node] = max(vc1.get(node, 0), vc2.get(node, 0))
+    merged = dict(vc1)
+    for node, c2 in vc2.items():
+        if node not in merged or c2 > merged[node]:
+            merged[node] = c2
 
     return merged
 
@@ -43,16 +45,30 @@ def compare(vc1: Dict[str, int], vc2: Dict[str, int]) -> VCComparison:
     vc1_bigger = False
     vc2_bigger = False
 
-    all_nodes = set(vc1.keys()) | set(vc2.keys())
-
-    for node in all_nodes:
-        c1 = vc1.get(node, 0)
+    # Single pass over each clock (no key-set union); stop as soon as
+    # both sides are ahead somewhere, since that can only be CONCURRENT
+    for node, c1 in vc1.items():
         c2 = vc2.get(node, 0)
-
         if c1 > c2:
             vc1_bigger = True
         elif c2 > c1:
             vc2_bigger = True
+        else:
+            continue
+        if vc1_bigger and vc2_bigger:
+            return VCComparison.CONCURRENT
+
+    for node, c2 in vc2.items():
+        if node in vc1:
+            continue
+        if c2 > 0:
+            vc2_bigger = True
+        elif c2 < 0:
+            vc1_bigger = True
+        else:
+            continue
+        if vc1_bigger and vc2_bigger:
+            return VCComparison.CONCURRENT
 
     if vc1_bigger and not vc2_bigger:
         return VCComparison.DOMINATES